@@ -8,28 +8,244 @@
 import json
 import sys
 import os
-import glob
 import re
+import io
+import stat
+import contextlib
+import importlib.util
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from itertools import repeat
+import numpy as np
 import pandas as pd
 from typing import Dict, Any, List, Tuple, Optional, Union
 from pathlib import Path
 
+try:
+    # orjson为可选依赖，安装后JSON解析速度显著提升
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+# pyarrow为可选依赖，输出Parquet文件时需要
+_HAS_PYARROW = importlib.util.find_spec('pyarrow') is not None
+
+# python-calamine为可选依赖，安装后使用其Rust实现的读取器读取Excel文件；
+# pandas 2.2起才支持calamine引擎，低版本仍使用默认引擎
+_PANDAS_VERSION = tuple(int(v) for v in re.findall(r'\d+', pd.__version__)[:2])
+if importlib.util.find_spec('python_calamine') is not None and _PANDAS_VERSION >= (2, 2):
+    _EXCEL_ENGINE = 'calamine'
+else:
+    _EXCEL_ENGINE = None
+
+try:
+    # numba为可选依赖，安装后大型几何的范围计算使用单次遍历的编译内核
+    from numba import njit
+except ImportError:
+    njit = None
+
+# 坐标点数不少于该值时才使用numba内核，避免点数据也触发JIT编译
+_NUMBA_MIN_COORDS = 1024
+
+if njit is not None:
+    @njit(cache=True)
+    def _bounds_batch_kernel(flat_xy, offsets):
+        """
+        单次遍历 (N, 2) 坐标数组，按offsets分段计算每个几何的范围
+        
+        第i个几何的坐标为 flat_xy[offsets[i]:offsets[i + 1]]，返回 (xmin, ymin, xmax, ymax) 四个数组
+        """
+        n = offsets.size - 1
+        xmin = np.empty(n)
+        ymin = np.empty(n)
+        xmax = np.empty(n)
+        ymax = np.empty(n)
+        for i in range(n):
+            start = offsets[i]
+            min_x = max_x = flat_xy[start, 0]
+            min_y = max_y = flat_xy[start, 1]
+            for j in range(start + 1, offsets[i + 1]):
+                x = flat_xy[j, 0]
+                y = flat_xy[j, 1]
+                if x < min_x:
+                    min_x = x
+                elif x > max_x:
+                    max_x = x
+                if y < min_y:
+                    min_y = y
+                elif y > max_y:
+                    max_y = y
+            xmin[i] = min_x
+            ymin[i] = min_y
+            xmax[i] = max_x
+            ymax[i] = max_y
+        return xmin, ymin, xmax, ymax
+else:
+    _bounds_batch_kernel = None
+
+# GeoJSON规范中的全部对象类型（小写）
+_GEOJSON_TYPES = frozenset((
+    'point', 'multipoint', 'linestring', 'multilinestring', 'polygon', 'multipolygon',
+    'geometrycollection', 'feature', 'featurecollection',
+))
+
+# 各GeoJSON几何类型坐标数组中坐标点所在的嵌套深度
+_COORD_DEPTH = {
+    'point': 0,
+    'multipoint': 1,
+    'linestring': 1,
+    'multilinestring': 2,
+    'polygon': 2,
+    'multipolygon': 3,
+}
+
+# WKT开头：支持的几何类型关键字、可选的Z/M/ZM维度标记，随后必须是左括号
+_WKT_HEAD_RE = re.compile(r'\s*(?:MULTI)?(?:POINT|LINESTRING|POLYGON)\s*(?:ZM|Z|M)?\s*\(', re.IGNORECASE)
+
+# 预编译的正则表达式
+_COORD_PAIR_RE = re.compile(r'^\s*\(\s*-?\d+\.?\d*\s*,\s*-?\d+\.?\d*\s*\)\s*$')
+_COORD_ARRAY_RE = re.compile(r'^\s*\[\s*-?\d+\.?\d*\s*,\s*-?\d+\.?\d*\s*\]\s*$')
+_NUMBER_RE = re.compile(r'-?\d+\.?\d*')
+_WKT_COORD_PAIR_RE = re.compile(r'(-?\d+\.?\d*)\s+(-?\d+\.?\d*)')
+# WKT坐标部分的括号替换为空格，逗号另行替换为inf分隔标记，便于np.fromstring整体转换并校验每个坐标点的维度
+_WKT_BRACKETS = str.maketrans('()', '  ')
+# WKT中第一个坐标点（最内层左括号后到逗号或右括号为止）
+_WKT_FIRST_POINT_RE = re.compile(r'\(\s*([^\s(),][^(),]*)')
+
+# 超过该大小的CSV文件通过内存映射读取，避免整文件复制到堆内存
+_MEMORY_MAP_THRESHOLD = 10 * 1024 * 1024
+
+# 超过该大小的CSV文件分块读取和写出，内存占用只与每块行数有关
+_CSV_CHUNK_THRESHOLD = 256 * 1024 * 1024
+_CSV_CHUNK_ROWS = 50_000
+
+@contextlib.contextmanager
+def _buffered_stdout():
+    """缓存代码块中的输出，结束时一次性写出，减少逐行写入的系统调用"""
+    buffer = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(buffer):
+            yield
+    finally:
+        sys.stdout.write(buffer.getvalue())
+
+# 输出文件中新增的8个坐标字段
+BOUNDS_COLUMNS = [
+    'top_left_longitude', 'top_left_latitude',
+    'bottom_left_longitude', 'bottom_left_latitude',
+    'top_right_longitude', 'top_right_latitude',
+    'bottom_right_longitude', 'bottom_right_latitude'
+]
+
+def _build_bounds_info(min_lon: float, min_lat: float, max_lon: float, max_lat: float) -> Dict[str, Any]:
+    """由坐标范围组装边界信息字典"""
+    return {
+        "top_left_longitude": min_lon,
+        "top_left_latitude": max_lat,
+        "bottom_left_longitude": min_lon,
+        "bottom_left_latitude": min_lat,
+        "top_right_longitude": max_lon,
+        "top_right_latitude": max_lat,
+        "bottom_right_longitude": max_lon,
+        "bottom_right_latitude": min_lat,
+        "center": [(min_lon + max_lon) / 2, (min_lat + max_lat) / 2],
+        "width": max_lon - min_lon,
+        "height": max_lat - min_lat
+    }
+
+@dataclass
+class BoundsArray:
+    """
+    一批几何数据的边界范围，以4个并行数组存储（结构数组布局）
+    
+    下标i对应第i个几何，无有效坐标的几何对应位置为NaN
+    """
+    xmin: np.ndarray
+    ymin: np.ndarray
+    xmax: np.ndarray
+    ymax: np.ndarray
+    
+    @classmethod
+    def empty(cls, size: int) -> 'BoundsArray':
+        """创建指定长度、全部为NaN的边界数组"""
+        return cls(*(np.full(size, np.nan) for _ in range(4)))
+    
+    def take(self, indices: np.ndarray) -> 'BoundsArray':
+        """按下标数组取出边界，下标为负数的位置为NaN"""
+        indices = np.asarray(indices)
+        missing = indices < 0
+        taken = []
+        for values in (self.xmin, self.ymin, self.xmax, self.ymax):
+            column = values[np.where(missing, 0, indices)] if len(values) else np.full(len(indices), np.nan)
+            column[missing] = np.nan
+            taken.append(column)
+        return BoundsArray(*taken)
+    
+    @property
+    def width(self) -> np.ndarray:
+        return self.xmax - self.xmin
+    
+    @property
+    def height(self) -> np.ndarray:
+        return self.ymax - self.ymin
+    
+    @property
+    def center(self) -> Tuple[np.ndarray, np.ndarray]:
+        return (self.xmin + self.xmax) / 2, (self.ymin + self.ymax) / 2
+    
+    def corner_columns(self) -> Dict[str, np.ndarray]:
+        """按BOUNDS_COLUMNS顺序返回8个角点坐标列"""
+        corners = (
+            self.xmin, self.ymax,
+            self.xmin, self.ymin,
+            self.xmax, self.ymax,
+            self.xmax, self.ymin,
+        )
+        return dict(zip(BOUNDS_COLUMNS, corners))
+    
+    def bounds_info(self, index: int) -> Dict[str, Any]:
+        """返回第index个几何的边界信息字典，格式与calculate_bounds一致"""
+        return _build_bounds_info(float(self.xmin[index]), float(self.ymin[index]),
+                                  float(self.xmax[index]), float(self.ymax[index]))
+
 class GeometryProcessor:
     """几何数据处理器"""
     
-    def __init__(self, geometry_field_name: str = 'geom'):
-        self.supported_excel_formats = ['.csv', '.xlsx', '.xls']
+    def __init__(self, geometry_field_name: str = 'geom', output_format: Optional[str] = None):
+        """
+        Args:
+            geometry_field_name: 几何数据字段名
+            output_format: 输出格式（可选），默认与输入文件相同，'parquet'表示输出Parquet文件（需要pyarrow）
+        """
+        if output_format not in (None, 'parquet'):
+            raise ValueError(f"不支持的输出格式: {output_format}")
+        if output_format == 'parquet' and not _HAS_PYARROW:
+            raise ValueError("输出Parquet文件需要安装pyarrow: pip install pyarrow")
+        
+        self.supported_excel_formats = frozenset(('.csv', '.xlsx', '.xls'))
         self.geometry_field_name = geometry_field_name
+        self.output_format = output_format
         self.processed_count = 0
         self.error_files = []
         self.success_files = []
+        self._ensured_dirs = set()
+        
+        # 可按列格式直接分派的格式：格式类型 -> (识别函数, 解析函数)
+        self._format_parsers = {
+            "wkt": (self._is_wkt, self._parse_wkt),
+            "coordinate_pair": (self._is_coordinate_pair, self._parse_coordinate_pair),
+            "coordinate_array": (self._is_coordinate_array, self._parse_coordinate_array),
+        }
     
-    def detect_geometry_format(self, geom_str: str) -> Tuple[str, Dict[str, Any]]:
+    def detect_geometry_format(self, geom_str: str, format_hint: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
         """
         检测几何数据的格式
         
         Args:
             geom_str: 几何数据字符串
+            format_hint: 预期格式（可选），匹配时跳过其他格式的检测
             
         Returns:
             (格式类型, 解析后的几何数据)
@@ -39,18 +255,36 @@ class GeometryProcessor:
         
         geom_str = str(geom_str).strip()
         
-        # 检测GeoJSON格式
-        if self._is_geojson(geom_str):
-            return "geojson", self._parse_geojson(geom_str)
+        # 已知列格式时直接按该格式识别解析，不匹配再走完整检测
+        if format_hint in self._format_parsers:
+            is_format, parse = self._format_parsers[format_hint]
+            if is_format(geom_str):
+                return format_hint, parse(geom_str)
+        
+        # JSON类格式只解析一次，按解析结果的类型分派
+        is_json, data = self._try_json(geom_str)
+        if is_json:
+            # 检测GeoJSON格式
+            if self._is_geojson(data):
+                return "geojson", self._parse_geojson(data)
+            
+            # 其他JSON格式
+            try:
+                if isinstance(data, list):
+                    # 假设是坐标数组
+                    return "json", {"coordinates": data}
+                elif isinstance(data, dict):
+                    # 假设是几何对象
+                    return "json", self._extract_coordinates_from_geojson(data)
+                else:
+                    raise ValueError("不支持的JSON格式")
+            except Exception as e:
+                raise ValueError(f"JSON解析错误: {str(e)}")
         
         # 检测WKT格式
         if self._is_wkt(geom_str):
             return "wkt", self._parse_wkt(geom_str)
         
-        # 检测JSON格式
-        if self._is_json(geom_str):
-            return "json", self._parse_json(geom_str)
-        
         # 检测坐标对格式 (经度,纬度)
         if self._is_coordinate_pair(geom_str):
             return "coordinate_pair", self._parse_coordinate_pair(geom_str)
@@ -61,52 +295,49 @@ class GeometryProcessor:
         
         return "unknown", {}
     
-    def _is_geojson(self, geom_str: str) -> bool:
-        """检测是否为GeoJSON格式"""
+    def _try_json(self, geom_str: str) -> Tuple[bool, Any]:
+        """
+        尝试按JSON解析
+        
+        Returns:
+            (是否为JSON, 解析结果)
+        """
         try:
-            data = json.loads(geom_str)
-            return isinstance(data, dict) and 'type' in data
-        except:
+            return True, _json_loads(geom_str)
+        except ValueError:
+            pass
+        
+        # orjson不接受标准库json支持的NaN/Infinity字面量，对象和数组再用标准库解析一次
+        if _json_loads is not json.loads and geom_str[:1] in ('{', '['):
+            try:
+                return True, json.loads(geom_str)
+            except ValueError:
+                pass
+        return False, None
+    
+    def _is_geojson(self, data: Any) -> bool:
+        """检测解析后的JSON数据是否为GeoJSON格式"""
+        if not isinstance(data, dict):
             return False
+        geojson_type = data.get('type')
+        return isinstance(geojson_type, str) and geojson_type.lower() in _GEOJSON_TYPES
     
     def _is_wkt(self, geom_str: str) -> bool:
         """检测是否为WKT格式"""
-        # 清理字符串，移除换行符和多余空格
-        cleaned_str = re.sub(r'\s+', ' ', geom_str.strip())
-        
-        # 更宽松的WKT模式匹配，支持嵌套括号
-        wkt_patterns = [
-            r'^POINT\s*\(.*\)$',
-            r'^LINESTRING\s*\(.*\)$',
-            r'^POLYGON\s*\(.*\)$',
-            r'^MULTIPOINT\s*\(.*\)$',
-            r'^MULTILINESTRING\s*\(.*\)$',
-            r'^MULTIPOLYGON\s*\(.*\)$'
-        ]
-        return any(re.match(pattern, cleaned_str.upper()) for pattern in wkt_patterns)
-    
-    def _is_json(self, geom_str: str) -> bool:
-        """检测是否为JSON格式"""
-        try:
-            json.loads(geom_str)
-            return True
-        except:
-            return False
+        # 只检查开头的类型关键字和结尾的括号，坐标内容由解析步骤处理
+        return geom_str.rstrip().endswith(')') and _WKT_HEAD_RE.match(geom_str) is not None
     
     def _is_coordinate_pair(self, geom_str: str) -> bool:
         """检测是否为坐标对格式 (经度,纬度)"""
-        pattern = r'^\s*\(\s*-?\d+\.?\d*\s*,\s*-?\d+\.?\d*\s*\)\s*$'
-        return bool(re.match(pattern, geom_str))
+        return bool(_COORD_PAIR_RE.match(geom_str))
     
     def _is_coordinate_array(self, geom_str: str) -> bool:
         """检测是否为坐标数组格式 [经度,纬度]"""
-        pattern = r'^\s*\[\s*-?\d+\.?\d*\s*,\s*-?\d+\.?\d*\s*\]\s*$'
-        return bool(re.match(pattern, geom_str))
+        return bool(_COORD_ARRAY_RE.match(geom_str))
     
-    def _parse_geojson(self, geom_str: str) -> Dict[str, Any]:
+    def _parse_geojson(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """解析GeoJSON格式"""
         try:
-            data = json.loads(geom_str)
             return self._extract_coordinates_from_geojson(data)
         except Exception as e:
             raise ValueError(f"GeoJSON解析错误: {str(e)}")
@@ -114,12 +345,17 @@ class GeometryProcessor:
     def _parse_wkt(self, geom_str: str) -> Dict[str, Any]:
         """解析WKT格式"""
         try:
+            # 常见情况下直接整体转换坐标，无法转换时使用正则逐对提取
+            coordinates = self._parse_wkt_numbers(geom_str)
+            if coordinates is not None:
+                return {"coordinates": coordinates}
+            
             coordinates = []
             
             # 处理复杂的WKT格式（如MULTIPOLYGON）
             # 移除所有多余的括号，提取所有坐标对
             # 使用更灵活的正则表达式来匹配坐标对
-            coord_pairs = re.findall(r'(-?\d+\.?\d*)\s+(-?\d+\.?\d*)', geom_str)
+            coord_pairs = _WKT_COORD_PAIR_RE.findall(geom_str)
             
             if not coord_pairs:
                 raise ValueError("无法提取WKT坐标")
@@ -137,26 +373,45 @@ class GeometryProcessor:
         except Exception as e:
             raise ValueError(f"WKT解析错误: {str(e)}")
     
-    def _parse_json(self, geom_str: str) -> Dict[str, Any]:
-        """解析JSON格式"""
-        try:
-            data = json.loads(geom_str)
-            if isinstance(data, list):
-                # 假设是坐标数组
-                return {"coordinates": data}
-            elif isinstance(data, dict):
-                # 假设是几何对象
-                return self._extract_coordinates_from_geojson(data)
-            else:
-                raise ValueError("不支持的JSON格式")
-        except Exception as e:
-            raise ValueError(f"JSON解析错误: {str(e)}")
+    def _parse_wkt_numbers(self, geom_str: str) -> Optional[np.ndarray]:
+        """
+        用np.fromstring一次性转换WKT中的所有坐标数值
+        
+        坐标维度（XY、XYZ、XYZM）由第一个坐标点确定，只返回经纬度两列。
+        含嵌套关键字（如GEOMETRYCOLLECTION）、无效或非有限数值、各点维度不一致时返回None
+        """
+        first_point = _WKT_FIRST_POINT_RE.search(geom_str)
+        if not first_point:
+            return None
+        
+        dims = len(first_point.group(1).split())
+        if dims < 2:
+            return None
+        
+        body = geom_str[geom_str.index('('):].translate(_WKT_BRACKETS).replace(',', ' inf ')
+        with warnings.catch_warnings():
+            # 遇到无法转换的内容时np.fromstring只发出警告并返回已转换部分，这里视为失败
+            warnings.simplefilter('error', DeprecationWarning)
+            try:
+                values = np.fromstring(body, sep=' ')
+            except (DeprecationWarning, ValueError):
+                return None
+        
+        # 每个坐标点应为dims个有限数值加一个分隔标记（末尾补齐一个），否则交给正则逐对提取
+        point_count = geom_str.count(',') + 1
+        if values.size + 1 != point_count * (dims + 1):
+            return None
+        
+        points = np.append(values, np.inf).reshape(point_count, dims + 1)
+        if not (np.isinf(points[:, -1]).all() and np.isfinite(points[:, :-1]).all()):
+            return None
+        return points[:, :2]
     
     def _parse_coordinate_pair(self, geom_str: str) -> Dict[str, Any]:
         """解析坐标对格式"""
         try:
             # 提取数字
-            numbers = re.findall(r'-?\d+\.?\d*', geom_str)
+            numbers = _NUMBER_RE.findall(geom_str)
             if len(numbers) >= 2:
                 lon, lat = float(numbers[0]), float(numbers[1])
                 return {"coordinates": [[lon, lat]]}
@@ -169,7 +424,7 @@ class GeometryProcessor:
         """解析坐标数组格式"""
         try:
             # 提取数字
-            numbers = re.findall(r'-?\d+\.?\d*', geom_str)
+            numbers = _NUMBER_RE.findall(geom_str)
             if len(numbers) >= 2:
                 lon, lat = float(numbers[0]), float(numbers[1])
                 return {"coordinates": [[lon, lat]]}
@@ -180,148 +435,396 @@ class GeometryProcessor:
     
     def _extract_coordinates_from_geojson(self, geojson_data: Dict[str, Any]) -> Dict[str, Any]:
         """从GeoJSON数据中提取坐标"""
-        coordinates = []
-        
-        def extract_coordinates(obj):
-            if isinstance(obj, list):
-                if len(obj) > 0 and isinstance(obj[0], (int, float)):
-                    coordinates.append(obj)
-                else:
-                    for item in obj:
-                        extract_coordinates(item)
-        
-        geojson_type = geojson_data.get('type', '').lower()
+        geojson_type = str(geojson_data.get('type', '')).lower()
         
         if geojson_type == 'featurecollection':
-            for feature in geojson_data.get('features', []):
-                geometry = feature.get('geometry', {})
-                extract_coordinates(geometry.get('coordinates', []))
+            parts = [self._flatten_coords(feature.get('geometry') or {})
+                     for feature in geojson_data.get('features', [])]
+            coordinates = np.vstack(parts) if parts else np.empty((0, 2))
         elif geojson_type == 'feature':
-            geometry = geojson_data.get('geometry', {})
-            extract_coordinates(geometry.get('coordinates', []))
+            coordinates = self._flatten_coords(geojson_data.get('geometry') or {})
         else:
-            extract_coordinates(geojson_data.get('coordinates', []))
+            coordinates = self._flatten_coords(geojson_data, geojson_type)
         
         return {"coordinates": coordinates}
     
-    def calculate_bounds(self, coordinates: List[List[float]]) -> Dict[str, Any]:
-        """计算坐标的边界信息"""
-        if not coordinates:
-            raise ValueError("没有有效的坐标数据")
+    def _flatten_coords(self, geometry: Dict[str, Any], geom_type: Optional[str] = None) -> np.ndarray:
+        """
+        按几何类型将坐标展平为 (N, 2) 的float64数组
         
-        lons = [coord[0] for coord in coordinates]
-        lats = [coord[1] for coord in coordinates]
-        
-        min_lon, max_lon = min(lons), max(lons)
-        min_lat, max_lat = min(lats), max(lats)
-        
-        bounds_info = {
-            "top_left_longitude": min_lon,
-            "top_left_latitude": max_lat,
-            "bottom_left_longitude": min_lon,
-            "bottom_left_latitude": min_lat,
-            "top_right_longitude": max_lon,
-            "top_right_latitude": max_lat,
-            "bottom_right_longitude": max_lon,
-            "bottom_right_latitude": min_lat,
-            "center": [(min_lon + max_lon) / 2, (min_lat + max_lat) / 2],
-            "width": max_lon - min_lon,
-            "height": max_lat - min_lat
-        }
+        Args:
+            geometry: GeoJSON几何对象
+            geom_type: 已转为小写的几何类型（可选，调用方已计算时传入避免重复处理）
+        """
+        if geom_type is None:
+            geom_type = str(geometry.get('type', '')).lower()
+        
+        if geom_type == 'geometrycollection':
+            parts = [self._flatten_coords(child) for child in geometry.get('geometries', [])]
+            return np.vstack(parts) if parts else np.empty((0, 2))
+        
+        coords = geometry.get('coordinates', [])
+        if not coords:
+            return np.empty((0, 2))
+        
+        # 按类型确定嵌套深度后逐层展开，未知类型按任意嵌套的坐标数组处理
+        depth = _COORD_DEPTH.get(geom_type, 1)
+        if depth <= 1:
+            return self._to_xy_array(coords)
         
-        return bounds_info
+        # 展开到坐标点序列（环/线）一层，嵌套与声明的类型不符时按通用坐标数组处理
+        rings = coords
+        if depth == 3:
+            if not all(isinstance(part, list) for part in coords):
+                return self._to_xy_array(coords)
+            rings = [ring for part in coords for ring in part]
+        if not all(isinstance(ring, list) for ring in rings):
+            return self._to_xy_array(coords)
+        
+        arrays = [self._to_xy_array(ring) for ring in rings]
+        return np.concatenate(arrays) if arrays else np.empty((0, 2))
     
-    def process_excel_file(self, input_file: str, output_dir: str = None):
-        """处理Excel文件中的几何数据"""
+    def _to_xy_array(self, coords) -> np.ndarray:
+        """将坐标或坐标数组转换为 (N, 2) 的float64数组，忽略高程等额外维度"""
         try:
-            print(f"📄 正在读取文件: {input_file}")
-            
-            # 读取Excel文件
-            if input_file.lower().endswith('.csv'):
-                df = pd.read_csv(input_file, encoding='utf-8')
+            arr = np.asarray(coords, dtype=np.float64)
+        except ValueError:
+            # 嵌套层级不规则
+            return self._flatten_ragged_coords(coords)
+        
+        # 单个数值（如坐标为"12"）不构成坐标点
+        if arr.size == 0 or arr.ndim == 0:
+            return np.empty((0, 2))
+        if arr.shape[-1] < 2:
+            raise ValueError("坐标维度不足，至少需要经度和纬度")
+        xy = arr.reshape(-1, arr.shape[-1])[:, :2]
+        # JSON中的null等会被转换为NaN，不能当作有效坐标
+        if not np.isfinite(xy).all():
+            raise ValueError("坐标包含无效数值")
+        return xy
+    
+    def _flatten_ragged_coords(self, coords) -> np.ndarray:
+        """用显式栈展开嵌套层级不规则的坐标数组，每个规则的子数组整体转换"""
+        parts = []
+        stack = [coords]
+        while stack:
+            obj = stack.pop()
+            try:
+                arr = np.asarray(obj, dtype=np.float64)
+            except ValueError:
+                # 只展开列表节点，字符串等其他无法转换的内容视为格式错误
+                if not isinstance(obj, (list, tuple)):
+                    raise ValueError("坐标格式错误")
+                # 逆序入栈以保持坐标的原始顺序
+                stack.extend(reversed(obj))
+                continue
+            if arr.size > 0:
+                parts.append(self._to_xy_array(arr))
+        
+        return np.concatenate(parts) if parts else np.empty((0, 2))
+    
+    def calculate_extent(self, coordinates: Union[np.ndarray, List[List[float]]]) -> Tuple[float, float, float, float]:
+        """
+        计算坐标的范围
+        
+        Returns:
+            (最小经度, 最小纬度, 最大经度, 最大纬度)
+        """
+        arr = self._to_xy_array(coordinates)
+        if len(arr) == 0:
+            raise ValueError("没有有效的坐标数据")
+        
+        if _bounds_batch_kernel is not None and len(arr) >= _NUMBA_MIN_COORDS:
+            offsets = np.array([0, len(arr)], dtype=np.int64)
+            xmin, ymin, xmax, ymax = _bounds_batch_kernel(np.ascontiguousarray(arr), offsets)
+            return float(xmin[0]), float(ymin[0]), float(xmax[0]), float(ymax[0])
+        
+        min_lon, min_lat = arr.min(axis=0).tolist()
+        max_lon, max_lat = arr.max(axis=0).tolist()
+        return min_lon, min_lat, max_lon, max_lat
+    
+    def calculate_bounds(self, coordinates: Union[np.ndarray, List[List[float]]]) -> Dict[str, Any]:
+        """计算坐标的边界信息"""
+        return _build_bounds_info(*self.calculate_extent(coordinates))
+    
+    def calculate_bounds_batch(self, coordinates_list: List[Any]) -> BoundsArray:
+        """
+        批量计算多个几何的边界
+        
+        Args:
+            coordinates_list: 每个几何的坐标数据，为None或空时对应位置保持NaN
+        """
+        bounds = BoundsArray.empty(len(coordinates_list))
+        
+        positions = []
+        arrays = []
+        for i, coordinates in enumerate(coordinates_list):
+            if coordinates is None:
+                continue
+            # 解析阶段已得到(N, 2)的浮点数组，无需再次转换和检查
+            if (isinstance(coordinates, np.ndarray) and coordinates.ndim == 2
+                    and coordinates.shape[1] == 2 and coordinates.dtype == np.float64):
+                arr = coordinates
             else:
-                df = pd.read_excel(input_file)
-            
-            print(f"✅ 成功读取文件，共 {len(df)} 行数据")
+                # 按转换后的坐标点数判断，如[[]]转换后为空，不能参与分段归约
+                arr = self._to_xy_array(coordinates)
+            if len(arr) > 0:
+                positions.append(i)
+                arrays.append(arr)
+        
+        if not arrays:
+            return bounds
+        
+        # 所有坐标拼接为一个连续数组，第i个几何的坐标位于 offsets[i]:offsets[i + 1]
+        lengths = np.fromiter((len(arr) for arr in arrays), dtype=np.int64, count=len(arrays))
+        offsets = np.zeros(len(arrays) + 1, dtype=np.int64)
+        np.cumsum(lengths, out=offsets[1:])
+        flat = np.ascontiguousarray(np.concatenate(arrays))
+        
+        positions = np.asarray(positions, dtype=np.int64)
+        if _bounds_batch_kernel is not None and len(flat) >= _NUMBA_MIN_COORDS:
+            xmin, ymin, xmax, ymax = _bounds_batch_kernel(flat, offsets)
+        else:
+            mins = np.minimum.reduceat(flat, offsets[:-1], axis=0)
+            maxs = np.maximum.reduceat(flat, offsets[:-1], axis=0)
+            xmin, ymin = mins[:, 0], mins[:, 1]
+            xmax, ymax = maxs[:, 0], maxs[:, 1]
+        
+        bounds.xmin[positions] = xmin
+        bounds.ymin[positions] = ymin
+        bounds.xmax[positions] = xmax
+        bounds.ymax[positions] = ymax
+        return bounds
+    
+    def read_excel_file(self, file_path: str, file_size: Optional[int] = None) -> pd.DataFrame:
+        """
+        读取Excel/CSV文件为DataFrame
+        
+        Args:
+            file_path: 文件路径
+            file_size: 已知的文件大小（可选），大型CSV文件会使用内存映射读取
+        """
+        if file_path.lower().endswith('.csv'):
+            # 始终使用C引擎：pyarrow引擎会把超长整数ID读成float64等，改变原有数据
+            if file_size is None:
+                file_size = os.path.getsize(file_path)
+            return pd.read_csv(file_path, encoding='utf-8',
+                               memory_map=file_size > _MEMORY_MAP_THRESHOLD)
+        return pd.read_excel(file_path, engine=_EXCEL_ENGINE)
+    
+    def _read_header(self, file_path: str) -> pd.DataFrame:
+        """只读取表头，返回不含数据行的DataFrame"""
+        if file_path.lower().endswith('.csv'):
+            return pd.read_csv(file_path, encoding='utf-8', nrows=0)
+        return pd.read_excel(file_path, engine=_EXCEL_ENGINE, nrows=0)
+    
+    def _detect_column_format(self, values) -> Optional[str]:
+        """
+        以第一个非空几何数据判断整列的格式，同一列通常只使用一种格式
+        
+        Returns:
+            可直接分派的格式类型，无法判断时返回None
+        """
+        for geom_str in values:
+            try:
+                format_type, _ = self.detect_geometry_format(geom_str)
+            except Exception:
+                return None
+            if format_type != "empty":
+                return format_type if format_type in self._format_parsers else None
+        return None
+    
+    def _parse_geometry_cell(self, geom_str: Any, format_hint: Optional[str] = None) -> Tuple[str, Any]:
+        """
+        解析单个几何单元格
+        
+        Args:
+            geom_str: 几何数据
+            format_hint: 列的主要格式（可选），见detect_geometry_format
             
-            # 检查是否存在几何数据字段
-            if self.geometry_field_name not in df.columns:
-                raise ValueError(f"文件中未找到'{self.geometry_field_name}'字段")
+        Returns:
+            (状态, 详情)：状态为"ok"时详情为坐标数组；为"error"时详情为错误信息；
+            其余状态（"empty"、"unknown"、"no_coordinates"）详情为None
+        """
+        try:
+            format_type, parsed_data = self.detect_geometry_format(geom_str, format_hint)
             
-            print("🔍 正在处理几何数据...")
+            if format_type in ("empty", "unknown"):
+                return format_type, None
             
-            # 新增字段
-            new_columns = [
-                'top_left_longitude', 'top_left_latitude',
-                'bottom_left_longitude', 'bottom_left_latitude',
-                'top_right_longitude', 'top_right_latitude',
-                'bottom_right_longitude', 'bottom_right_latitude'
-            ]
+            coordinates = self._to_xy_array(parsed_data.get('coordinates', []))
+            if len(coordinates) == 0:
+                return "no_coordinates", None
             
-            for col in new_columns:
-                df[col] = None
+            return "ok", coordinates
+        
+        except Exception as e:
+            return "error", str(e)
+    
+    def _prepare_for_parquet(self, df: pd.DataFrame):
+        """
+        将混合类型的object列（如同一列中既有整数又有字符串）转为字符串，空值保持不变
+        
+        Parquet每列只能有一种类型，pyarrow无法写出混合类型的列
+        """
+        for col in df.columns:
+            column = df[col]
+            if column.dtype != object:
+                continue
+            if column.dropna().map(type).nunique() > 1:
+                df[col] = column.where(column.isna(), column.astype(str))
+    
+    def _is_large_csv(self, file_path: str, file_size: Optional[int] = None) -> bool:
+        """是否为需要分块读取和写出的大型CSV文件（输出Parquet时不分块）"""
+        if self.output_format == 'parquet' or not file_path.lower().endswith('.csv'):
+            return False
+        if file_size is None:
+            file_size = os.path.getsize(file_path)
+        return file_size > _CSV_CHUNK_THRESHOLD
+    
+    def _add_bounds_columns(self, df: pd.DataFrame) -> Tuple[int, int]:
+        """
+        解析df中的几何数据，并将边界角点坐标写入新增字段
+        
+        Returns:
+            (成功行数, 失败行数)
+        """
+        # 相同的几何字符串只解析一次：factorize得到每行对应的唯一值编号（空值为-1）
+        geometries = df[self.geometry_field_name]
+        codes, unique_geoms = pd.factorize(geometries)
+        format_hint = self._detect_column_format(unique_geoms)
+        unique_results = [self._parse_geometry_cell(geom_str, format_hint) for geom_str in unique_geoms]
+        
+        # 按行顺序汇总处理信息，循环结束后一次性输出
+        processed_count = 0
+        error_count = 0
+        messages = []
+        
+        for index, code in zip(geometries.index, codes):
+            status, detail = unique_results[code] if code >= 0 else ("empty", None)
             
-            # 处理每一行数据
-            processed_count = 0
-            error_count = 0
+            if status == "ok":
+                processed_count += 1
+                continue
+            elif status == "empty":
+                messages.append(f"  ⚠️ 第 {index+1} 行: 几何数据为空")
+                continue
             
-            for index, row in df.iterrows():
-                try:
-                    geom_str = row[self.geometry_field_name]
-                    
-                    # 检测几何格式
-                    format_type, parsed_data = self.detect_geometry_format(geom_str)
-                    
-                    if format_type == "empty":
-                        print(f"  ⚠️ 第 {index+1} 行: 几何数据为空")
-                        continue
-                    elif format_type == "unknown":
-                        print(f"  ❌ 第 {index+1} 行: 无法识别的几何格式")
-                        error_count += 1
-                        continue
-                    
-                    # 计算边界
-                    coordinates = parsed_data.get('coordinates', [])
-                    if not coordinates:
-                        print(f"  ❌ 第 {index+1} 行: 无法提取坐标数据")
-                        error_count += 1
-                        continue
-                    
-                    bounds_info = self.calculate_bounds(coordinates)
-                    
-                    # 更新数据
-                    df.at[index, 'top_left_longitude'] = bounds_info['top_left_longitude']
-                    df.at[index, 'top_left_latitude'] = bounds_info['top_left_latitude']
-                    df.at[index, 'bottom_left_longitude'] = bounds_info['bottom_left_longitude']
-                    df.at[index, 'bottom_left_latitude'] = bounds_info['bottom_left_latitude']
-                    df.at[index, 'top_right_longitude'] = bounds_info['top_right_longitude']
-                    df.at[index, 'top_right_latitude'] = bounds_info['top_right_latitude']
-                    df.at[index, 'bottom_right_longitude'] = bounds_info['bottom_right_longitude']
-                    df.at[index, 'bottom_right_latitude'] = bounds_info['bottom_right_latitude']
+            error_count += 1
+            if status == "unknown":
+                messages.append(f"  ❌ 第 {index+1} 行: 无法识别的几何格式")
+            elif status == "no_coordinates":
+                messages.append(f"  ❌ 第 {index+1} 行: 无法提取坐标数据")
+            else:
+                messages.append(f"  ❌ 第 {index+1} 行处理失败: {detail}")
+        
+        if messages:
+            print("\n".join(messages))
+        
+        # 按唯一几何计算边界，再按编号展开到每一行，整列写入新增字段
+        unique_coordinates = [detail if status == "ok" else None
+                              for status, detail in unique_results]
+        bounds = self.calculate_bounds_batch(unique_coordinates).take(codes)
+        for col, values in bounds.corner_columns().items():
+            df[col] = values
+        
+        return processed_count, error_count
+    
+    def _process_csv_in_chunks(self, input_file: str, output_path: Path) -> Tuple[int, int]:
+        """
+        分块读取大型CSV文件，逐块计算边界并追加写入输出文件
+        
+        行号在各块之间连续，内存占用只与分块大小有关。所有列按字符串读取，
+        避免各块分别推断类型导致同一列在输出中格式不一致（如整数列某一块含空值时变为1.0）。
+        先写入临时文件，全部完成后再重命名为输出文件，失败时不留下不完整的结果
+        
+        Returns:
+            (成功行数, 失败行数)
+        """
+        print(f"📄 正在分块读取文件: {input_file}（每块 {_CSV_CHUNK_ROWS} 行）")
+        
+        processed_count = 0
+        error_count = 0
+        total_rows = 0
+        temp_path = output_path.with_name(f".{output_path.name}.tmp")
+        
+        try:
+            with pd.read_csv(input_file, encoding='utf-8', dtype=str, chunksize=_CSV_CHUNK_ROWS) as reader:
+                for chunk_number, chunk in enumerate(reader):
+                    first_chunk = chunk_number == 0
+                    if first_chunk:
+                        # 检查是否存在几何数据字段
+                        if self.geometry_field_name not in chunk.columns:
+                            raise ValueError(f"文件中未找到'{self.geometry_field_name}'字段")
+                        print("🔍 正在处理几何数据...")
                     
-                    processed_count += 1
+                    processed, errors = self._add_bounds_columns(chunk)
+                    processed_count += processed
+                    error_count += errors
                     
-                    if (index + 1) % 100 == 0:
-                        print(f"  📊 已处理 {index + 1} 行数据...")
-                
-                except Exception as e:
-                    print(f"  ❌ 第 {index+1} 行处理失败: {str(e)}")
-                    error_count += 1
+                    chunk.to_csv(temp_path, mode='w' if first_chunk else 'a',
+                                 header=first_chunk, index=False, encoding='utf-8')
+                    total_rows += len(chunk)
             
+            os.replace(temp_path, output_path)
+        except BaseException:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(temp_path)
+            raise
+        
+        print(f"✅ 成功读取文件，共 {total_rows} 行数据")
+        return processed_count, error_count
+    
+    def process_excel_file(self, input_file: str, output_dir: str = None,
+                           df: Optional[pd.DataFrame] = None):
+        """
+        处理Excel文件中的几何数据
+        
+        Args:
+            input_file: 输入文件路径
+            output_dir: 输出目录（可选，默认保存到原目录）
+            df: 已读取的数据（可选，通常来自validate_excel_file，避免重复读取文件）
+        """
+        try:
             # 生成输出文件名
             input_path = Path(input_file)
-            output_filename = f"{input_path.stem}_with_bounds{input_path.suffix}"
+            if self.output_format == 'parquet':
+                # 保留原扩展名，避免同名的a.csv与a.xlsx输出到同一个Parquet文件
+                output_filename = f"{input_path.stem}_{input_path.suffix.lstrip('.')}_with_bounds.parquet"
+            else:
+                output_filename = f"{input_path.stem}_with_bounds{input_path.suffix}"
             
             if output_dir:
                 output_path = Path(output_dir) / output_filename
             else:
                 output_path = input_path.parent / output_filename
             
-            # 保存文件
-            if input_file.lower().endswith('.csv'):
-                df.to_csv(output_path, index=False, encoding='utf-8')
+            if df is None and self._is_large_csv(input_file):
+                # 大型CSV文件分块读取、处理和写出
+                processed_count, error_count = self._process_csv_in_chunks(input_file, output_path)
             else:
-                df.to_excel(output_path, index=False)
+                if df is None:
+                    print(f"📄 正在读取文件: {input_file}")
+                    df = self.read_excel_file(input_file)
+                    print(f"✅ 成功读取文件，共 {len(df)} 行数据")
+                else:
+                    print(f"✅ 使用已读取的数据，共 {len(df)} 行数据")
+                
+                # 检查是否存在几何数据字段
+                if self.geometry_field_name not in df.columns:
+                    raise ValueError(f"文件中未找到'{self.geometry_field_name}'字段")
+                
+                print("🔍 正在处理几何数据...")
+                processed_count, error_count = self._add_bounds_columns(df)
+                
+                # 保存文件
+                if self.output_format == 'parquet':
+                    self._prepare_for_parquet(df)
+                    df.to_parquet(output_path, index=False)
+                elif input_file.lower().endswith('.csv'):
+                    df.to_csv(output_path, index=False, encoding='utf-8')
+                else:
+                    df.to_excel(output_path, index=False)
             
             print(f"✅ 已生成: {output_filename}")
             print(f"📊 处理结果: 成功 {processed_count} 行，失败 {error_count} 行")
@@ -332,44 +835,87 @@ class GeometryProcessor:
             print(f"❌ 处理文件时出错: {str(e)}")
             raise
     
-    def validate_excel_file(self, file_path: str) -> Tuple[bool, str]:
-        """验证Excel文件"""
-        try:
-            if not os.path.exists(file_path):
-                return False, f"文件不存在: {file_path}"
-            
-            file_ext = Path(file_path).suffix.lower()
-            if file_ext not in self.supported_excel_formats:
-                return False, f"不支持的文件格式: {file_ext}"
-            
-            file_size = os.path.getsize(file_path)
-            if file_size == 0:
-                return False, f"文件为空: {file_path}"
+    def validate_excel_file(self, file_path: str, file_size: Optional[int] = None,
+                            keep_data: bool = True) -> Tuple[bool, str, Optional[pd.DataFrame]]:
+        """
+        验证Excel文件
+        
+        Args:
+            file_path: 文件路径
+            file_size: 已知的文件大小（可选，如目录扫描时已获取，可省去重复的stat调用）
+            keep_data: 是否完整读取文件并返回数据供后续处理复用，为False时只读取表头检查字段
+        
+        Returns:
+            (是否有效, 错误信息, 读取到的数据)，验证失败或只读取表头时数据为None
+        """
+        file_ext = os.path.splitext(file_path)[1].lower()
+        if file_ext not in self.supported_excel_formats:
+            return False, f"不支持的文件格式: {file_ext}", None
+        
+        if file_size is None:
+            # 一次stat同时完成存在性、文件类型和大小检查
+            try:
+                file_stat = os.stat(file_path)
+            except OSError:
+                return False, f"文件不存在: {file_path}", None
             
-            # 尝试读取文件
-            if file_path.lower().endswith('.csv'):
-                df = pd.read_csv(file_path, encoding='utf-8')
+            if not stat.S_ISREG(file_stat.st_mode):
+                return False, f"不是常规文件: {file_path}", None
+            file_size = file_stat.st_size
+        
+        if file_size == 0:
+            return False, f"文件为空: {file_path}", None
+        
+        # 尝试读取文件，读取结果交给后续处理复用；不复用或大型CSV文件只读取表头，由处理阶段读取数据
+        # 只在读取环节捕获异常：不同读取引擎（csv/openpyxl/xlrd）抛出的异常类型各不相同
+        header_only = not keep_data or self._is_large_csv(file_path, file_size)
+        try:
+            if header_only:
+                df = self._read_header(file_path)
             else:
-                df = pd.read_excel(file_path)
-            
-            if self.geometry_field_name not in df.columns:
-                return False, f"文件中未找到'{self.geometry_field_name}'字段"
-            
-            return True, ""
-            
+                df = self.read_excel_file(file_path, file_size)
         except Exception as e:
-            return False, f"文件验证失败: {str(e)}"
+            return False, f"文件验证失败: {str(e)}", None
+        
+        if self.geometry_field_name not in df.columns:
+            return False, f"文件中未找到'{self.geometry_field_name}'字段", None
+        
+        return True, "", None if header_only else df
+    
+    def _ensure_output_dir(self, output_dir: str):
+        """确保输出目录存在，同一目录只检查一次"""
+        if output_dir in self._ensured_dirs:
+            return
+        
+        if not os.path.isdir(output_dir):
+            os.makedirs(output_dir, exist_ok=True)
+            print(f"📁 创建输出目录: {output_dir}")
+        self._ensured_dirs.add(output_dir)
     
-    def process_directory(self, input_dir: str, output_dir: str = None, geometry_field_name: str = 'geom'):
-        """批量处理目录下的所有Excel文件"""
+    def process_directory(self, input_dir: str, output_dir: str = None, geometry_field_name: str = 'geom',
+                          max_workers: Optional[int] = None):
+        """
+        批量处理目录下的所有Excel文件
+        
+        Args:
+            input_dir: 输入目录
+            output_dir: 输出目录（可选，默认保存到原目录）
+            geometry_field_name: 几何数据字段名
+            max_workers: 并行处理的进程数（可选，默认为CPU核心数，为1时在当前进程中顺序处理）
+        """
         # 更新几何字段名
         self.geometry_field_name = geometry_field_name
         print(f"🔍 正在扫描目录: {input_dir}")
         
+        # 单次遍历目录，DirEntry缓存了文件名和stat信息，文件大小直接交给验证步骤
         excel_files = []
-        for ext in self.supported_excel_formats:
-            pattern = os.path.join(input_dir, f"*{ext}")
-            excel_files.extend(glob.glob(pattern))
+        with os.scandir(input_dir) as entries:
+            for entry in entries:
+                if entry.name.startswith('.') or not entry.is_file():
+                    continue
+                if os.path.splitext(entry.name)[1].lower() in self.supported_excel_formats:
+                    excel_files.append((entry.path, entry.stat().st_size))
+        excel_files.sort()
         
         if not excel_files:
             print(f"❌ 在目录 {input_dir} 中未找到任何Excel文件")
@@ -378,91 +924,176 @@ class GeometryProcessor:
         print(f"📁 找到 {len(excel_files)} 个Excel文件")
         print("=" * 80)
         
-        print("🔍 正在验证文件格式...")
-        valid_files = []
+        # 各文件相互独立，多个文件时分发到进程池并行处理
+        workers = min(max_workers or os.cpu_count() or 1, len(excel_files))
+        pool = ProcessPoolExecutor(max_workers=workers) if workers > 1 else contextlib.nullcontext()
         
-        for file_path in excel_files:
-            filename = os.path.basename(file_path)
-            print(f"  检查: {filename}")
-            
-            is_valid, error_msg = self.validate_excel_file(file_path)
-            
-            if is_valid:
-                valid_files.append(file_path)
-                print(f"  ✅ 格式正确")
-            else:
-                self.error_files.append((file_path, error_msg))
-                print(f"  ❌ 格式错误: {error_msg}")
+        # 只有一个文件时完整读取并保留数据供处理复用；多个文件时验证只读取表头，由处理阶段读取数据，每个文件只完整读取一次
+        keep_data = len(excel_files) == 1
         
-        if self.error_files:
-            print("\n" + "=" * 80)
-            print("❌ 发现格式错误的文件，程序停止执行")
-            print("请手动处理以下文件后重新运行程序:")
-            print("-" * 80)
+        with pool as executor:
+            map_files = executor.map if executor else map
             
-            for file_path, error_msg in self.error_files:
-                filename = os.path.basename(file_path)
-                print(f"文件: {filename}")
-                print(f"错误: {error_msg}")
-                print("-" * 40)
+            print("🔍 正在验证文件格式...")
+            valid_files = []
             
-            sys.exit(1)
-        
-        print(f"\n✅ 所有文件验证通过，开始处理...")
-        print("=" * 80)
-        
-        for file_path in valid_files:
-            try:
+            # 先完成全部文件的验证，发现错误时不写出任何结果
+            results = map_files(_validate_file_worker,
+                                [file_path for file_path, _ in excel_files],
+                                repeat(self.geometry_field_name),
+                                repeat(self.output_format),
+                                [file_size for _, file_size in excel_files],
+                                repeat(keep_data))
+            for file_path, is_valid, error_msg, df in results:
                 filename = os.path.basename(file_path)
-                print(f"\n📄 处理文件: {filename}")
                 
-                output_path = self.process_excel_file(file_path, output_dir)
+                with _buffered_stdout():
+                    print(f"  检查: {filename}")
+                    
+                    if is_valid:
+                        valid_files.append((file_path, df))
+                        print(f"  ✅ 格式正确")
+                    else:
+                        self.error_files.append((file_path, error_msg))
+                        print(f"  ❌ 格式错误: {error_msg}")
+            
+            if self.error_files:
+                print("\n" + "=" * 80)
+                print("❌ 发现格式错误的文件，程序停止执行")
+                print("请手动处理以下文件后重新运行程序:")
+                print("-" * 80)
                 
-                self.success_files.append(filename)
-                self.processed_count += 1
+                for file_path, error_msg in self.error_files:
+                    filename = os.path.basename(file_path)
+                    print(f"文件: {filename}")
+                    print(f"错误: {error_msg}")
+                    print("-" * 40)
                 
-            except Exception as e:
-                print(f"❌ 处理文件时出错: {str(e)} - {filename}")
-                self.error_files.append((file_path, str(e)))
+                sys.exit(1)
+            
+            if output_dir:
+                try:
+                    self._ensure_output_dir(output_dir)
+                except OSError as e:
+                    print(f"❌ 无法创建输出目录: {str(e)}")
+                    sys.exit(1)
+            
+            print(f"\n✅ 所有文件验证通过，开始处理...")
+            print("=" * 80)
+            
+            if executor is None:
+                # 未使用进程池时在当前进程中直接处理，处理信息实时输出
+                while valid_files:
+                    file_path, df = valid_files.pop(0)
+                    print(f"\n📄 处理文件: {os.path.basename(file_path)}")
+                    try:
+                        self.process_excel_file(file_path, output_dir, df)
+                    except Exception as e:
+                        self._record_result(file_path, str(e))
+                    else:
+                        self._record_result(file_path, None)
+                    del df
+            else:
+                file_paths = [file_path for file_path, _ in valid_files]
+                valid_files.clear()
+                
+                results = executor.map(_process_file_worker, file_paths, repeat(output_dir),
+                                       repeat(self.geometry_field_name), repeat(self.output_format))
+                for file_path, error_msg, log in results:
+                    with _buffered_stdout():
+                        print(f"\n📄 处理文件: {os.path.basename(file_path)}")
+                        print(log, end='')
+                        self._record_result(file_path, error_msg)
         
         self.print_summary()
     
+    def _record_result(self, file_path: str, error_msg: Optional[str]):
+        """记录单个文件的处理结果，失败时输出错误信息"""
+        filename = os.path.basename(file_path)
+        if error_msg is None:
+            self.success_files.append(filename)
+            self.processed_count += 1
+        else:
+            print(f"❌ 处理文件时出错: {error_msg} - {filename}")
+            self.error_files.append((file_path, error_msg))
+    
     def print_summary(self):
         """打印处理结果摘要"""
-        print("\n" + "=" * 80)
-        print("📊 处理结果摘要")
-        print("=" * 80)
-        print(f"✅ 成功处理: {self.processed_count} 个文件")
-        
-        if self.success_files:
-            print("\n📁 成功生成的文件:")
-            for filename in self.success_files:
-                print(f"  - {filename}")
-        
-        if self.error_files:
-            print(f"\n❌ 处理失败: {len(self.error_files)} 个文件")
-            for file_path, error_msg in self.error_files:
-                filename = os.path.basename(file_path)
-                print(f"  - {filename}: {error_msg}")
-        
-        print("=" * 80)
+        with _buffered_stdout():
+            print("\n" + "=" * 80)
+            print("📊 处理结果摘要")
+            print("=" * 80)
+            print(f"✅ 成功处理: {self.processed_count} 个文件")
+            
+            if self.success_files:
+                print("\n📁 成功生成的文件:")
+                for filename in self.success_files:
+                    print(f"  - {filename}")
+            
+            if self.error_files:
+                print(f"\n❌ 处理失败: {len(self.error_files)} 个文件")
+                for file_path, error_msg in self.error_files:
+                    filename = os.path.basename(file_path)
+                    print(f"  - {filename}: {error_msg}")
+            
+            print("=" * 80)
+
+def _validate_file_worker(file_path: str, geometry_field_name: str, output_format: Optional[str] = None,
+                          file_size: Optional[int] = None,
+                          keep_data: bool = False) -> Tuple[str, bool, str, Optional[pd.DataFrame]]:
+    """
+    验证单个文件（可在子进程中执行）
+    
+    Args:
+        keep_data: 是否完整读取并返回数据，为False时只读取表头，数据为None，避免DataFrame在进程间传递和长时间驻留内存
+    
+    Returns:
+        (文件路径, 是否有效, 错误信息, 读取到的数据)
+    """
+    processor = GeometryProcessor(geometry_field_name, output_format)
+    is_valid, error_msg, df = processor.validate_excel_file(file_path, file_size, keep_data)
+    return file_path, is_valid, error_msg, df
+
+def _process_file_worker(file_path: str, output_dir: Optional[str], geometry_field_name: str,
+                         output_format: Optional[str] = None) -> Tuple[str, Optional[str], str]:
+    """
+    在子进程中处理单个文件，文件在子进程中重新读取
+    
+    处理过程中的输出先写入缓冲区，由主进程按文件顺序统一打印，避免多进程输出交错
+    
+    Returns:
+        (文件路径, 错误信息（成功时为None）, 处理日志)
+    """
+    processor = GeometryProcessor(geometry_field_name, output_format)
+    buffer = io.StringIO()
+    error_msg = None
+    
+    with contextlib.redirect_stdout(buffer):
+        try:
+            processor.process_excel_file(file_path, output_dir)
+        except Exception as e:
+            error_msg = str(e)
+    
+    return file_path, error_msg, buffer.getvalue()
 
 def print_usage():
     """打印使用说明"""
     print("🔲 Excel几何数据矩形面批量创建器")
     print("=" * 50)
-    print("用法: python create_rectangle_from_geojson.py <输入目录> [输出目录] [几何字段名]")
+    print("用法: python create_rectangle_from_geojson.py <输入目录> [输出目录] [几何字段名] [--parquet]")
     print()
     print("参数说明:")
     print("  <输入目录>    包含Excel文件的目录绝对路径")
     print("  [输出目录]    生成文件的保存目录绝对路径（可选，默认保存到原目录）")
     print("  [几何字段名]  几何数据字段名（可选，默认为'geom'）")
+    print("  [--parquet]   输出Parquet文件（可选，需要安装pyarrow），文件名为 原文件名_扩展名_with_bounds.parquet")
     print()
     print("示例:")
     print("  python create_rectangle_from_geojson.py C:\\data\\excel C:\\output")
     print("  python create_rectangle_from_geojson.py C:\\data\\excel C:\\output geometry")
     print("  python create_rectangle_from_geojson.py /home/user/data")
     print("  python create_rectangle_from_geojson.py /home/user/data /home/user/output coordinates")
+    print("  python create_rectangle_from_geojson.py /home/user/data /home/user/output --parquet")
     print()
     print("功能:")
     print("  - 批量处理目录下所有Excel文件(.csv, .xlsx)")
@@ -475,13 +1106,17 @@ def print_usage():
 
 def main():
     """主函数"""
-    if len(sys.argv) < 2 or len(sys.argv) > 4:
+    # --parquet可出现在任意位置，其余为位置参数
+    args = [arg for arg in sys.argv[1:] if arg != '--parquet']
+    output_format = 'parquet' if len(args) < len(sys.argv) - 1 else None
+    
+    if len(args) < 1 or len(args) > 3:
         print_usage()
         sys.exit(1)
     
-    input_dir = sys.argv[1].strip().strip('"')
-    output_dir = sys.argv[2].strip().strip('"') if len(sys.argv) >= 3 else None
-    geometry_field_name = sys.argv[3].strip().strip('"') if len(sys.argv) == 4 else 'geom'
+    input_dir = args[0].strip().strip('"')
+    output_dir = args[1].strip().strip('"') if len(args) >= 2 else None
+    geometry_field_name = args[2].strip().strip('"') if len(args) == 3 else 'geom'
     
     if not os.path.exists(input_dir):
         print(f"❌ 输入目录不存在: {input_dir}")
@@ -491,16 +1126,11 @@ def main():
         print(f"❌ 输入路径不是目录: {input_dir}")
         sys.exit(1)
     
-    if output_dir:
-        try:
-            if not os.path.exists(output_dir):
-                os.makedirs(output_dir)
-                print(f"📁 创建输出目录: {output_dir}")
-        except Exception as e:
-            print(f"❌ 无法创建输出目录: {str(e)}")
-            sys.exit(1)
-    
-    processor = GeometryProcessor(geometry_field_name)
+    try:
+        processor = GeometryProcessor(geometry_field_name, output_format)
+    except ValueError as e:
+        print(f"❌ {str(e)}")
+        sys.exit(1)
     
     try:
         processor.process_directory(input_dir, output_dir, geometry_field_name)